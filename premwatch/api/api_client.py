@@ -0,0 +1,742 @@
+"""Client for the football-data API used to populate the prem-watch database."""
+
+import asyncio
+import concurrent.futures
+import gzip
+import hashlib
+import json
+import logging
+import os
+import socket
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - optional dependency
+    aiohttp = None
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover - optional dependency
+    ijson = None
+
+try:
+    import pyarrow
+except ImportError:  # pragma: no cover - optional dependency
+    pyarrow = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    _loads = json.loads
+
+    def _dumps(obj):
+        return json.dumps(obj).encode()
+
+else:
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+    # Also swap the decoder requests uses internally, so any stray
+    # response.json() call in the codebase gets the C parser without
+    # touching its call site.
+    requests.models.complexjson = type(
+        "_OrjsonShim",
+        (),
+        {
+            "loads": staticmethod(orjson.loads),
+            "dumps": staticmethod(lambda obj, **kwargs: orjson.dumps(obj).decode()),
+        },
+    )
+
+
+log = logging.getLogger(__name__)
+
+_BASE_URL = "https://api.football-data-api.com"
+
+_EMPTY_PARAMS = {}
+
+
+class RateLimited(Exception):
+    """Raised when the API answers 429 and the client must back off.
+
+    ``retry_after`` carries the server-mandated delay in seconds, already
+    applied to the shared token bucket by the time this is raised.
+    """
+
+    def __init__(self, retry_after):
+        super().__init__(f"rate limited, retry after {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+def _merge_params(template, /, **optional):
+    """Merge the non-None optional params onto an immutable endpoint template."""
+    return template | {k: v for k, v in optional.items() if v is not None}
+
+
+_KEEPALIVE_OPTIONS = [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+if hasattr(socket, "TCP_KEEPIDLE"):  # Linux
+    _KEEPALIVE_OPTIONS.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 60))
+elif hasattr(socket, "TCP_KEEPALIVE"):  # macOS
+    _KEEPALIVE_OPTIONS.append((socket.IPPROTO_TCP, socket.TCP_KEEPALIVE, 60))
+
+
+class _KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter that turns on TCP keep-alive for pooled connections.
+
+    Scheduled workers can sit idle for minutes between bursts; keep-alive
+    probes stop middleboxes from silently dropping the warm connection, so
+    the next burst reuses it instead of paying a fresh DNS resolve and TLS
+    handshake.
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["socket_options"] = (
+            HTTPConnection.default_socket_options + _KEEPALIVE_OPTIONS
+        )
+        super().init_poolmanager(*args, **kwargs)
+
+
+class TokenBucket:
+    """Token-bucket rate limiter sized to the API's hourly request quota.
+
+    Tokens refill continuously at ``refill_rate`` per second up to ``capacity``.
+    A full bucket lets bursts (e.g. a paginated fetch) run at network speed;
+    callers only sleep once the bucket is drained.
+    """
+
+    def __init__(self, capacity, refill_rate):
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.tokens = float(capacity)
+        self.last_refill = time.monotonic()
+        self._next_slot = self.last_refill
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        """Claim one token and return how long the caller must wait for it.
+
+        Waits are handed out as deadlines: when the bucket is empty each
+        caller is assigned its own future refill slot, so concurrent waiters
+        wake staggered at the refill rate instead of stampeding together,
+        and time already spent in flight counts against the wait.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity,
+                self.tokens + (now - self.last_refill) * self.refill_rate,
+            )
+            self.last_refill = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                self._next_slot = now
+                return 0.0
+            slot = max(self._next_slot, now) + 1.0 / self.refill_rate
+            self._next_slot = slot
+            # The token refilling at `slot` belongs to this caller; advance
+            # the refill clock past it so later callers cannot double-spend.
+            self.last_refill = slot
+            self.tokens = 0.0
+            return slot - now
+
+    def acquire(self):
+        """Take one token, sleeping until one is available if the bucket is empty."""
+        wait = self._reserve()
+        if wait:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Async variant of :meth:`acquire` that yields instead of blocking."""
+        wait = self._reserve()
+        if wait:
+            await asyncio.sleep(wait)
+
+    def penalise(self, seconds):
+        """Drain the bucket and hold off refilling for ``seconds``.
+
+        Used when the server answers 429: whatever our local accounting says,
+        the server's word is final.
+        """
+        with self._lock:
+            self.tokens = 0.0
+            self.last_refill = time.monotonic() + seconds
+            self._next_slot = self.last_refill
+
+
+class ApiClient:
+    """Wraps the football-data API endpoints behind one rate-limited session."""
+
+    base_url = _BASE_URL
+
+    # The endpoint set is fixed, so resolve every full URL once at class
+    # definition instead of formatting it on each call.
+    _ENDPOINTS = (
+        "league-list",
+        "country-list",
+        "todays-matches",
+        "league-statistics",
+        "league-matches",
+        "league-teams",
+        "league-players",
+        "league-referees",
+        "team",
+        "lastx",
+        "match",
+        "league-tables",
+        "player-stats",
+        "referee",
+        "stats-data-btts",
+        "stats-data-over25",
+    )
+    _URLS = {e: f"{_BASE_URL}/{e}" for e in _ENDPOINTS}
+
+    # Endpoints that never take per-call params; their requests can be
+    # prepared once and re-sent, skipping the merge/prepare pipeline.
+    _NO_PARAM_ENDPOINTS = frozenset(
+        {"country-list", "stats-data-btts", "stats-data-over25"}
+    )
+
+    # The API allows 1800 requests per hour. Refill at that average rate but
+    # let bursts drain the bucket instead of spacing every call two seconds
+    # apart.
+    REQUESTS_PER_HOUR = 1800
+
+    # Warm connections held per host, shared by the sync pool and the async
+    # connector; sized for the comprehensive update's thread and coroutine
+    # fan-outs combined so no fetch waits on a pool slot.
+    POOL_SIZE = 64
+
+    # How long a cached response stays fresh, per endpoint. Near-static
+    # endpoints (countries, leagues) can be held far longer than live ones.
+    _TTL = {
+        "country-list": 86400,
+        "league-list": 3600,
+        "league-tables": 300,
+        "todays-matches": 60,
+        "match": 30,
+        "stats-data-btts": 3600,
+        "stats-data-over25": 3600,
+    }
+    _DEFAULT_TTL = 60
+
+    # Static query fragments per endpoint, merged with per-call params via
+    # _merge_params so the hot paths build one dict instead of mutating
+    # branch by branch.
+    _TEMPLATES = {
+        "league-matches": {"max_per_page": 1000},
+    }
+
+    # Once this few requests remain in the server-side window, pace the rest
+    # across the window instead of slamming into a 429 at full speed.
+    _RATE_LOW_WATERMARK = 10
+
+    # The quota is per API key, so every client built with the same key must
+    # draw from the same bucket — otherwise two instances would each think
+    # they own the full 1800/hour.
+    _buckets = {}
+    _buckets_lock = threading.Lock()
+
+    def __init__(self, api_key, cache_dir=None):
+        self.__api_key = api_key
+        # The session is built lazily on first request so that constructing
+        # clients (e.g. in tests) costs no TLS/urllib3 setup.
+        self.__session = None
+        # Optional persistent cache: with a cache_dir, payloads survive
+        # process restarts, so a daily cron re-run skips still-fresh fetches.
+        self.__cache_dir = cache_dir
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        with ApiClient._buckets_lock:
+            self.__bucket = ApiClient._buckets.setdefault(
+                api_key,
+                TokenBucket(self.REQUESTS_PER_HOUR, self.REQUESTS_PER_HOUR / 3600),
+            )
+        self.__cache = {}
+        self.__prepared = {}
+        self.__rate_remaining = None
+        self.__rate_reset = None
+
+    def _prepared_request(self, endpoint):
+        """Return the cached PreparedRequest for a fixed-shape endpoint."""
+        prepared = self.__prepared.get(endpoint)
+        if prepared is None:
+            request = requests.Request("GET", self._URLS[endpoint])
+            prepared = self.__prepared[endpoint] = self._session.prepare_request(
+                request
+            )
+        return prepared
+
+    def _build_session(self):
+        """Create the pooled, retry-capable session backing all requests."""
+        session = requests.Session()
+        session.params = {"key": self.__api_key}
+        # Stats payloads compress ~10x; ask for gzip explicitly rather than
+        # relying on the library default staying that way.
+        session.headers["Accept-Encoding"] = "gzip, deflate"
+        # Size the connection pool for the concurrent pagination fetches and
+        # let urllib3 retry transient server errors with backoff instead of
+        # surfacing them to every caller. 429 is deliberately absent: the
+        # adapter would sleep on Retry-After inside urllib3 with no token
+        # bucket accounting; it must reach _make_request so the bucket is
+        # penalised and RateLimited raised.
+        retry = Retry(
+            total=5,
+            backoff_factor=0.5,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=("GET",),
+            respect_retry_after_header=True,
+        )
+        adapter = _KeepAliveAdapter(
+            pool_connections=self.POOL_SIZE,
+            pool_maxsize=self.POOL_SIZE,
+            max_retries=retry,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    @property
+    def _session(self):
+        """The HTTP session, created on first use."""
+        if self.__session is None:
+            self.__session = self._build_session()
+        return self.__session
+
+    def _disk_cache_path(self, key):
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()
+        return os.path.join(self.__cache_dir, f"{digest}.json.gz")
+
+    def _disk_cache_load(self, key):
+        """Return a cache entry from disk, or None if absent/corrupt."""
+        if not self.__cache_dir:
+            return None
+        try:
+            with gzip.open(self._disk_cache_path(key), "rb") as fh:
+                entry = _loads(fh.read())
+        except (OSError, ValueError):
+            return None
+        # Stored wall-clock age translated onto the monotonic clock the
+        # in-memory TTL check uses.
+        age = max(0.0, time.time() - entry["ts"])
+        return (
+            time.monotonic() - age,
+            entry["body"],
+            entry.get("etag"),
+            entry.get("last_modified"),
+        )
+
+    def _disk_cache_store(self, key, body, etag, last_modified):
+        if not self.__cache_dir:
+            return
+        path = self._disk_cache_path(key)
+        entry = {
+            "ts": time.time(),
+            "body": body,
+            "etag": etag,
+            "last_modified": last_modified,
+        }
+        try:
+            with gzip.open(path + ".tmp", "wb") as fh:
+                fh.write(_dumps(entry))
+            os.replace(path + ".tmp", path)
+        except OSError as err:
+            log.warning("Could not write cache file %s: %s", path, err)
+
+    def _update_rate_limits(self, headers):
+        """Record the server's quota accounting from X-RateLimit-* headers."""
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset = headers.get("X-RateLimit-Reset")
+        if remaining is not None:
+            self.__rate_remaining = int(remaining)
+        if reset is not None:
+            self.__rate_reset = float(reset)
+
+    def _make_request(self, method, endpoint, params=None):
+        """Issue one rate-limited request and return the decoded JSON body.
+
+        Responses are cached per (endpoint, params) with a per-endpoint TTL,
+        so repeated calls inside one run skip the network entirely. Once the
+        TTL lapses the entry is revalidated with If-None-Match /
+        If-Modified-Since rather than refetched blindly: a 304 costs one
+        empty round trip instead of a full body transfer and decode.
+        """
+        key = (endpoint, tuple(sorted((params or {}).items())))
+        cached = self.__cache.get(key)
+        if cached is None:
+            cached = self._disk_cache_load(key)
+            if cached is not None:
+                self.__cache[key] = cached
+        if (
+            cached is not None
+            and time.monotonic() - cached[0] < self._TTL.get(endpoint, self._DEFAULT_TTL)
+        ):
+            return cached[1]
+        headers = None
+        if cached is not None:
+            headers = {}
+            if cached[2]:
+                headers["If-None-Match"] = cached[2]
+            if cached[3]:
+                headers["If-Modified-Since"] = cached[3]
+            headers = headers or None
+        url = self._URLS[endpoint]
+        self.__bucket.acquire()
+        if (
+            self.__rate_remaining is not None
+            and self.__rate_remaining <= self._RATE_LOW_WATERMARK
+        ):
+            wait = max(0.0, self.__rate_reset - time.time()) / max(
+                self.__rate_remaining, 1
+            )
+            if wait:
+                time.sleep(wait)
+        try:
+            if (
+                method == "GET"
+                and params is None
+                and headers is None
+                and endpoint in self._NO_PARAM_ENDPOINTS
+            ):
+                # Prepare once, send many: skips the per-call header merge,
+                # URL build and param encoding inside Session.request.
+                response = self._session.send(self._prepared_request(endpoint))
+            else:
+                response = self._session.request(
+                    method, url, params=params, headers=headers
+                )
+            if response.status_code == 304 and cached is not None:
+                # Body unchanged upstream: keep it and restart the TTL clock.
+                self.__cache[key] = (time.monotonic(),) + cached[1:]
+                return cached[1]
+            response.raise_for_status()
+            self._update_rate_limits(response.headers)
+            if response.status_code == 204 or not response.content:
+                # Nothing to decode (204, or a 304 with no cache entry);
+                # don't pay for the JSONDecodeError that _loads would raise.
+                return None
+            # Decode from the raw bytes: orjson's C parser skips the utf-8
+            # text pass that response.json() performs internally.
+            payload = _loads(response.content)
+        except requests.exceptions.HTTPError as http_err:
+            status = (
+                http_err.response.status_code
+                if http_err.response is not None
+                else None
+            )
+            if status == 429:
+                retry_after = http_err.response.headers.get("Retry-After")
+                retry_after = float(retry_after) if retry_after else 60.0
+                self.__bucket.penalise(retry_after)
+                # Don't swallow the signal: callers (and the adaptive
+                # limiter) need to know the quota is exhausted.
+                raise RateLimited(retry_after) from http_err
+            if status is not None and status >= 500:
+                log.warning("Server error from %s: %s", endpoint, http_err)
+            else:
+                log.error("HTTP error from %s: %s", endpoint, http_err)
+        except requests.exceptions.RequestException as err:
+            log.warning("Request to %s failed: %s", endpoint, err)
+            if cached is not None:
+                # A stale payload beats no payload when the API is unreachable.
+                return cached[1]
+        else:
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            self.__cache[key] = (time.monotonic(), payload, etag, last_modified)
+            self._disk_cache_store(key, payload, etag, last_modified)
+            return payload
+        return None
+
+    def get_leagues(self, chosen_leagues_only=False, country_id=None):
+        """Return the list of available leagues and their seasons."""
+        params = _merge_params(
+            _EMPTY_PARAMS,
+            chosen_leagues_only="true" if chosen_leagues_only else None,
+            country=country_id,
+        )
+        return self._make_request("GET", "league-list", params)
+
+    def get_countries(self):
+        """Return the list of countries supported by the API."""
+        return self._make_request("GET", "country-list")
+
+    def get_matches(self, date=None, timezone=None):
+        """Return today's matches, optionally for a specific date/timezone."""
+        params = _merge_params(_EMPTY_PARAMS, date=date, timezone=timezone)
+        return self._make_request("GET", "todays-matches", params)
+
+    def get_league_stats(self, season_id):
+        """Return aggregate statistics for one league season."""
+        return self._make_request("GET", "league-statistics", {"season_id": season_id})
+
+    def get_schedule(self, season_id, max_per_page=None):
+        """Return the full match schedule for one league season."""
+        params = _merge_params(
+            self._TEMPLATES["league-matches"],
+            season_id=season_id,
+            max_per_page=max_per_page,
+        )
+        return self._make_request("GET", "league-matches", params)
+
+    def get_league_teams(self, season_id, include_stats=False):
+        """Return the teams in one league season."""
+        params = _merge_params(
+            _EMPTY_PARAMS,
+            season_id=season_id,
+            include="stats" if include_stats else None,
+        )
+        return self._make_request("GET", "league-teams", params)
+
+    def get_league_players(self, season_id, include_stats=False):
+        """Return every player in one league season, merging paginated results."""
+        params = _merge_params(
+            _EMPTY_PARAMS,
+            season_id=season_id,
+            include="stats" if include_stats else None,
+        )
+        res = self._make_request("GET", "league-players", params)
+        if not res:
+            return res
+        max_page = res.get("pager", {}).get("max_page", 1)
+        if max_page > 1:
+            # Pages 2..N are independent, so fetch them concurrently; the
+            # token bucket still enforces the overall request budget.
+            with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+                futures = [
+                    executor.submit(
+                        self._make_request,
+                        "GET",
+                        "league-players",
+                        {**params, "page": page},
+                    )
+                    for page in range(2, max_page + 1)
+                ]
+                # The page count and page size are known up front, so fill a
+                # single preallocated list by slice assignment instead of
+                # growing it page by page.
+                page_size = len(res["data"])
+                merged = [None] * (max_page * page_size)
+                merged[:page_size] = res["data"]
+                pos = page_size
+                for future in futures:
+                    next_page = future.result()
+                    if next_page:
+                        data = next_page["data"]
+                        merged[pos : pos + len(data)] = data
+                        pos += len(data)
+                del merged[pos:]
+                res["data"] = merged
+        return res
+
+    def _stream_request(self, method, endpoint, params=None, prefix="data.item"):
+        """Yield items from a list endpoint without materialising the payload.
+
+        Peak memory stays at one record rather than the whole multi-MB
+        response. Requires ``ijson``.
+        """
+        if ijson is None:
+            raise RuntimeError("ijson is required for streaming requests")
+        url = self._URLS[endpoint]
+        self.__bucket.acquire()
+        with self._session.request(method, url, params=params, stream=True) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            yield from ijson.items(response.raw, prefix)
+
+    def _request_arrow(self, endpoint, params=None):
+        """Return a list endpoint's records as a columnar pyarrow.Table.
+
+        With ijson available the response is decoded record by record
+        rather than as one JSON document, but the records are still
+        collected into a list for Table.from_pylist — the saving is the
+        skipped full-payload JSON parse, not the row-oriented list itself.
+        Requires ``pyarrow``.
+        """
+        if pyarrow is None:
+            raise RuntimeError("pyarrow is required for Arrow output")
+        if ijson is not None:
+            records = list(self._stream_request("GET", endpoint, params))
+        else:
+            payload = self._make_request("GET", endpoint, params)
+            records = payload["data"] if payload else []
+        return pyarrow.Table.from_pylist(records)
+
+    def get_schedule_arrow(self, season_id, max_per_page=None):
+        """Return the match schedule as a pyarrow.Table for analytics use."""
+        params = _merge_params(
+            self._TEMPLATES["league-matches"],
+            season_id=season_id,
+            max_per_page=max_per_page,
+        )
+        return self._request_arrow("league-matches", params)
+
+    def get_league_players_arrow(self, season_id, include_stats=False):
+        """Return every player in one league season as a pyarrow.Table."""
+        if pyarrow is None:
+            raise RuntimeError("pyarrow is required for Arrow output")
+        return pyarrow.Table.from_pylist(
+            list(self.get_league_players_iter(season_id, include_stats))
+        )
+
+    def get_schedule_iter(self, season_id, max_per_page=None):
+        """Stream the match schedule for one league season record by record."""
+        params = _merge_params(
+            self._TEMPLATES["league-matches"],
+            season_id=season_id,
+            max_per_page=max_per_page,
+        )
+        return self._stream_request("GET", "league-matches", params)
+
+    def get_league_players_iter(self, season_id, include_stats=False):
+        """Yield every player in one league season, one page resident at a time."""
+        params = _merge_params(
+            _EMPTY_PARAMS,
+            season_id=season_id,
+            include="stats" if include_stats else None,
+        )
+        first = self._make_request("GET", "league-players", params)
+        if not first:
+            return
+        yield from first["data"]
+        max_page = first.get("pager", {}).get("max_page", 1)
+        for page in range(2, max_page + 1):
+            yield from self._stream_request(
+                "GET", "league-players", {**params, "page": page}
+            )
+
+    def iter_league_players(self, season_id, include_stats=False):
+        """Yield player records as each page lands, overlapping fetch and use.
+
+        Page 1 is yielded straight away; the remaining pages are fetched
+        concurrently and their rows yielded as each future completes (so
+        record order across pages is not preserved). Callers can start DB
+        writes or feature extraction while later pages are still in flight.
+        """
+        params = _merge_params(
+            _EMPTY_PARAMS,
+            season_id=season_id,
+            include="stats" if include_stats else None,
+        )
+        first = self._make_request("GET", "league-players", params)
+        if not first:
+            return
+        yield from first["data"]
+        max_page = first.get("pager", {}).get("max_page", 1)
+        if max_page <= 1:
+            return
+        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+            futures = [
+                executor.submit(
+                    self._make_request,
+                    "GET",
+                    "league-players",
+                    {**params, "page": page},
+                )
+                for page in range(2, max_page + 1)
+            ]
+            for future in concurrent.futures.as_completed(futures):
+                page = future.result()
+                if page:
+                    yield from page["data"]
+
+    def get_league_referees(self, season_id):
+        """Return the referees in one league season."""
+        return self._make_request("GET", "league-referees", {"season_id": season_id})
+
+    def get_league_table(self, season_id):
+        """Return the league table for one league season."""
+        return self._make_request("GET", "league-tables", {"season_id": season_id})
+
+    def get_team_data(self, team_id):
+        """Return the core data for one team."""
+        return self._make_request("GET", "team", {"team_id": team_id})
+
+    def get_team_form(self, team_id, last_x=None):
+        """Return recent-form stats for one team."""
+        params = _merge_params(_EMPTY_PARAMS, team_id=team_id, last_x=last_x)
+        return self._make_request("GET", "lastx", params)
+
+    def get_match_details(self, match_id):
+        """Return the detailed record for one match."""
+        return self._make_request("GET", "match", {"match_id": match_id})
+
+    async def fetch_many(self, endpoint, param_list, concurrency=8):
+        """Fetch one endpoint many times concurrently, returning the payloads.
+
+        Per-entity fan-outs are purely latency-bound, so overlapping the
+        requests on one keep-alive pool collapses N sequential round trips
+        into roughly N/concurrency. Results keep the order of
+        ``param_list``; failed fetches come back as None. Requires
+        ``aiohttp``.
+        """
+        if aiohttp is None:
+            raise RuntimeError("aiohttp is required for fetch_many")
+        semaphore = asyncio.Semaphore(concurrency)
+        connector = aiohttp.TCPConnector(limit=self.POOL_SIZE, ttl_dns_cache=300)
+        async with aiohttp.ClientSession(connector=connector) as session:
+
+            async def fetch_one(params):
+                async with semaphore:
+                    await self.__bucket.acquire_async()
+                    query = {"key": self.__api_key, **params}
+                    try:
+                        async with session.get(
+                            self._URLS[endpoint], params=query
+                        ) as response:
+                            response.raise_for_status()
+                            # Same C-parser shortcut as _make_request;
+                            # aiohttp defaults to stdlib json otherwise.
+                            return await response.json(
+                                loads=_loads, content_type=None
+                            )
+                    except aiohttp.ClientError as err:
+                        log.warning("Async request to %s failed: %s", endpoint, err)
+                        return None
+
+            return await asyncio.gather(*(fetch_one(p) for p in param_list))
+
+    def get_match_details_bulk(self, match_ids, chunk_size=100):
+        """Return detail records for many matches in a handful of requests.
+
+        The match endpoint accepts a comma-separated id list, so N matches
+        cost ceil(N/chunk_size) round trips instead of N.
+        """
+        match_ids = list(match_ids)
+        details = []
+        for start in range(0, len(match_ids), chunk_size):
+            chunk = match_ids[start : start + chunk_size]
+            payload = self._make_request(
+                "GET", "match", {"match_id": ",".join(map(str, chunk))}
+            )
+            if payload:
+                data = payload.get("data", [])
+                details.extend(data if isinstance(data, list) else [data])
+        return details
+
+    async def get_match_details_many(self, match_ids, concurrency=8):
+        """Fetch the detailed records for many matches concurrently."""
+        return await self.fetch_many(
+            "match", [{"match_id": m} for m in match_ids], concurrency
+        )
+
+    def get_player_stats(self, player_id):
+        """Return career stats for one player."""
+        return self._make_request("GET", "player-stats", {"player_id": player_id})
+
+    def get_referee_stats(self, referee_id):
+        """Return career stats for one referee."""
+        return self._make_request("GET", "referee", {"referee_id": referee_id})
+
+    def get_btts_stats(self):
+        """Return the top both-teams-to-score rankings."""
+        return self._make_request("GET", "stats-data-btts")
+
+    def get_over_25_stats(self):
+        """Return the top over-2.5-goals rankings."""
+        return self._make_request("GET", "stats-data-over25")
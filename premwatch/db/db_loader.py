@@ -0,0 +1,494 @@
+"""SQLite persistence layer for the prem-watch database.
+
+The loader grows tables to fit whatever the API returns: every record is a
+flat dict, columns are created on first sight, and writes are upserts keyed
+on ``id``.
+"""
+
+import functools
+import itertools
+import json
+import logging
+import queue
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Queued by close() to tell the writer thread to exit.
+_SENTINEL = object()
+
+if orjson is not None:
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+else:
+
+    def _dumps(value):
+        """Serialise a nested value to the bytes stored in JSON columns."""
+        return json.dumps(value).encode()
+
+    _loads = json.loads
+
+# Serialise nested structures at sqlite3's C binding boundary rather than
+# in a Python loop over every value of every row. The bytes go into BLOB
+# columns as-is — no UTF-8 decode on write or re-encode on read.
+sqlite3.register_adapter(dict, _dumps)
+sqlite3.register_adapter(list, _dumps)
+# Connections opened with detect_types=sqlite3.PARSE_DECLTYPES get columns
+# declared as JSON parsed back into Python structures automatically.
+sqlite3.register_converter("JSON", _loads)
+
+# Table and column names come from API payload keys and are interpolated
+# into DDL and PRAGMA statements, so only plain identifiers are accepted.
+_IDENT_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def _check_identifier(name):
+    """Reject anything that isn't a bare SQL identifier."""
+    if not _IDENT_RE.match(name):
+        raise ValueError(f"invalid SQL identifier: {name!r}")
+    return name
+
+
+# Column type per exact Python type — one dict lookup per value instead of
+# an isinstance chain. bool maps to INTEGER explicitly, matching how the
+# old chain classified it.
+_SQL_TYPE_MAP = {
+    int: "INTEGER",
+    bool: "INTEGER",
+    float: "REAL",
+    str: "TEXT",
+    dict: "BLOB",
+    list: "BLOB",
+}
+
+
+@functools.lru_cache(maxsize=64)
+def _compile_upsert(table_name, columns, row_groups=1):
+    """Return cached upsert SQL binding ``row_groups`` rows per statement.
+
+    Rows keyed on ``id`` use ON CONFLICT DO UPDATE, which mutates the
+    existing row in place where OR REPLACE deletes and re-inserts it —
+    keeping the rowid stable and sparing the index rewrites. Tables
+    without an id column keep OR REPLACE (there is no conflict target).
+
+    Repeat calls hand sqlite3 the identical string object, which also keeps
+    the connection's own prepared-statement cache at a 100% hit rate.
+    """
+    column_sql = ", ".join(f'"{c}"' for c in columns)
+    group = "(" + ", ".join("?" for _ in columns) + ")"
+    values_sql = ", ".join([group] * row_groups)
+    if "id" in columns:
+        update_sql = ", ".join(
+            f'"{c}"=excluded."{c}"' for c in columns if c != "id"
+        )
+        conflict_sql = (
+            f"DO UPDATE SET {update_sql}" if update_sql else "DO NOTHING"
+        )
+        return (
+            f'INSERT INTO "{table_name}" ({column_sql}) '
+            f"VALUES {values_sql} ON CONFLICT(id) {conflict_sql}"
+        )
+    return (
+        f'INSERT OR REPLACE INTO "{table_name}" '
+        f"({column_sql}) VALUES {values_sql}"
+    )
+
+
+class SQLiteLoader:
+    """Loads API records into SQLite, evolving the schema as payloads change."""
+
+    def __init__(self, db_path, synchronous="NORMAL", **pragma_overrides):
+        self.db_path = db_path
+        # isolation_level=None turns off sqlite3's implicit transaction
+        # machinery; transactions are managed explicitly via transaction().
+        # check_same_thread=False lets the background writer thread share
+        # the connection; writes stay serialised through the queue below.
+        self.conn = sqlite3.connect(
+            db_path, isolation_level=None, check_same_thread=False
+        )
+        # Rows read back through this connection behave like dicts without
+        # the per-row tuple-to-dict copies callers would otherwise write.
+        self.conn.row_factory = sqlite3.Row
+        # The database is an idempotent mirror of the API — a crash is
+        # repaired by re-fetching — so trade full durability for write
+        # throughput: WAL drops the per-commit journal rewrite and lets
+        # readers run during writes, relaxed synchronous collapses fsyncs.
+        if db_path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA mmap_size=268435456")
+        self.conn.execute(f"PRAGMA synchronous={synchronous}")
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+        self.conn.execute("PRAGMA cache_size=-65536")
+        self.conn.execute("PRAGMA busy_timeout=30000")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        # Callers with different durability or memory needs can override any
+        # pragma by keyword, e.g. SQLiteLoader(path, cache_size=-20000).
+        for pragma, value in pragma_overrides.items():
+            self.conn.execute(f"PRAGMA {pragma}={value}")
+        # One writer at a time: the lock serialises top-level transactions
+        # across threads, while the per-thread depth lets loader calls nest
+        # inside a transaction their own thread already opened.
+        self._write_lock = threading.Lock()
+        self._local = threading.local()
+        # Mirror of each known table's column set, kept in sync as columns
+        # are added; the schema only ever grows, so a superset hit means
+        # nothing is missing and no introspection query is needed.
+        self._table_columns = {}
+        # Single writer thread draining (table, rows) batches, so fetching
+        # threads hand off their payloads without blocking on SQLite.
+        # The first failed batch is recorded here and re-raised from
+        # flush()/close() so a lost table can't masquerade as success.
+        self._writer_error = None
+        self._write_queue = queue.Queue()
+        self._writer = threading.Thread(
+            target=self._drain_writes, name="sqlite-writer", daemon=True
+        )
+        self._writer.start()
+
+    def _drain_writes(self):
+        while True:
+            item = self._write_queue.get()
+            try:
+                if item is _SENTINEL:
+                    return
+                table_name, data_list = item
+                try:
+                    self.insert_or_update_many(table_name, data_list)
+                except Exception as err:
+                    logger.exception("Background write to %s failed", table_name)
+                    if self._writer_error is None:
+                        self._writer_error = err
+            finally:
+                self._write_queue.task_done()
+
+    def _raise_writer_error(self):
+        error, self._writer_error = self._writer_error, None
+        if error is not None:
+            raise error
+
+    def enqueue(self, table_name, data_list):
+        """Hand a batch to the writer thread and return immediately."""
+        self._write_queue.put((table_name, list(data_list)))
+
+    def flush(self):
+        """Block until every enqueued batch has been written.
+
+        Re-raises the first failed background batch instead of letting the
+        run report success over silently dropped rows.
+        """
+        self._write_queue.join()
+        self._raise_writer_error()
+
+    def begin(self):
+        """Open an explicit transaction; pair with commit() or rollback().
+
+        For callers that can't use the transaction() context manager (the
+        procedural update_db script wraps whole task bodies). Holds the
+        writer lock until commit()/rollback() and sets the nesting depth so
+        loader methods called inside join this transaction.
+        """
+        self._write_lock.acquire()
+        self.conn.execute("BEGIN IMMEDIATE")
+        self._local.txn_depth = 1
+
+    def commit(self):
+        self.conn.execute("COMMIT")
+        self._local.txn_depth = 0
+        self._write_lock.release()
+
+    def rollback(self):
+        self.conn.execute("ROLLBACK")
+        self._local.txn_depth = 0
+        self._write_lock.release()
+
+    @property
+    def reader(self):
+        """A read-only connection private to the calling thread.
+
+        Under WAL, readers on their own connections run without blocking
+        the writer; sharing self.conn would serialise them on its lock
+        instead. :memory: databases have no file to reopen, so they fall
+        back to the writer connection.
+        """
+        if self.db_path == ":memory:":
+            return self.conn
+        conn = getattr(self._local, "reader", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.reader = conn
+        return conn
+
+    def checkpoint(self):
+        """Fold the WAL back into the main file and refresh planner stats.
+
+        PASSIVE doesn't block concurrent readers; calling this after a bulk
+        run keeps the -wal file from growing without bound. PRAGMA optimize
+        re-analyses whichever tables changed enough to matter.
+        """
+        self.conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+        self.conn.execute("PRAGMA optimize")
+
+    def close(self):
+        self._write_queue.put(_SENTINEL)
+        self._writer.join()
+        self.conn.close()
+        # Surface any failure flush() never got a chance to report.
+        self._raise_writer_error()
+
+    @contextmanager
+    def transaction(self):
+        """Run a block inside one BEGIN IMMEDIATE/COMMIT; nests safely.
+
+        Without this every statement autocommits, paying one fsync per row.
+        Nested uses on the same thread join the outer transaction so
+        task-level wrapping and the loader's own batching compose; a
+        top-level entry takes the writer lock so concurrent threads
+        serialise on the short write section only.
+        """
+        depth = getattr(self._local, "txn_depth", 0)
+        if depth:
+            self._local.txn_depth = depth + 1
+            try:
+                yield
+            finally:
+                self._local.txn_depth -= 1
+            return
+        with self._write_lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            self._local.txn_depth = 1
+            try:
+                yield
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            else:
+                self.conn.execute("COMMIT")
+            finally:
+                self._local.txn_depth = 0
+
+    def _infer_sql_type(self, value):
+        """Map a Python value onto the SQLite column type used to store it."""
+        return _SQL_TYPE_MAP.get(type(value), "TEXT")
+
+    def _table_exists(self, table_name):
+        # Introspection goes through the read-only connection so schema
+        # checks never queue behind a write transaction on self.conn.
+        cursor = self.reader.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name=?",
+            (table_name,),
+        )
+        return cursor.fetchone() is not None
+
+    def _get_table_columns(self, table_name):
+        cached = self._table_columns.get(table_name)
+        if cached is not None:
+            return cached
+        _check_identifier(table_name)
+        cursor = self.reader.execute(f'PRAGMA table_info("{table_name}")')
+        return {row[1] for row in cursor.fetchall()}
+
+    def ensure_table_and_columns(self, table_name, data_dict):
+        """Create the table, or add any columns, needed to store ``data_dict``.
+
+        The cached column set makes the common case one superset check —
+        no sqlite_master or table_info round trip per batch — and stays
+        valid across payloads whose keys recombine, where a per-signature
+        memo would miss.
+        """
+        cached = self._table_columns.get(table_name)
+        if cached is not None and cached.issuperset(data_dict):
+            return
+        _check_identifier(table_name)
+        for key in data_dict:
+            _check_identifier(key)
+        with self.transaction():
+            if cached is None:
+                if self._table_exists(table_name):
+                    cached = self._get_table_columns(table_name)
+                else:
+                    column_defs = []
+                    for key, value in data_dict.items():
+                        definition = f'"{key}" {self._infer_sql_type(value)}'
+                        if key == "id":
+                            definition += " PRIMARY KEY"
+                        column_defs.append(definition)
+                    self.conn.execute(
+                        f'CREATE TABLE "{table_name}" ({", ".join(column_defs)})'
+                    )
+                    self._table_columns[table_name] = set(data_dict)
+                    return
+                self._table_columns[table_name] = cached
+            missing = [
+                (key, self._infer_sql_type(value))
+                for key, value in data_dict.items()
+                if key not in cached
+            ]
+            for key, sql_type in missing:
+                self.conn.execute(
+                    f'ALTER TABLE "{table_name}" '
+                    f'ADD COLUMN "{key}" {sql_type}'
+                )
+            cached.update(key for key, _ in missing)
+
+    def make_fast_inserter(self, table_name, columns):
+        """Return a callable that upserts one parameter tuple of fixed shape.
+
+        For hot loops over records whose columns are known up front: the
+        schema check, SQL compilation and cursor lookup all happen once
+        here, so each call is just a tuple bind and execute. Rows must
+        match ``columns`` in order. Use from one thread, inside a
+        transaction() block when loading batches.
+        """
+        columns = tuple(columns)
+        sql = _compile_upsert(table_name, columns)
+        execute = self.conn.cursor().execute
+        # Schema work waits for the first row so real values drive column
+        # type inference — an all-None probe would type everything TEXT
+        # and let TEXT affinity coerce integer ids to strings.
+        ready = self._table_columns.get(table_name, frozenset()).issuperset(
+            columns
+        )
+
+        def insert(row):
+            nonlocal ready
+            if not ready:
+                self.ensure_table_and_columns(table_name, dict(zip(columns, row)))
+                ready = True
+            execute(sql, row)
+
+        return insert
+
+    def bulk_init(self, tables):
+        """Create several tables in one round trip from representative rows.
+
+        ``tables`` maps table name to a sample record; the DDL for every
+        missing table is bundled into a single executescript call instead
+        of one execute per CREATE. Tables that already exist are left
+        untouched, so first-run init and steady-state startup share a path.
+        """
+        ddl = []
+        created = []
+        for table_name, probe in tables.items():
+            if table_name in self._table_columns or self._table_exists(table_name):
+                self._table_columns.setdefault(
+                    table_name, self._get_table_columns(table_name)
+                )
+                continue
+            _check_identifier(table_name)
+            column_defs = []
+            for key, value in probe.items():
+                _check_identifier(key)
+                definition = f'"{key}" {self._infer_sql_type(value)}'
+                if key == "id":
+                    definition += " PRIMARY KEY"
+                column_defs.append(definition)
+            ddl.append(f'CREATE TABLE "{table_name}" ({", ".join(column_defs)})')
+            created.append((table_name, set(probe)))
+        if not ddl:
+            return
+        with self._write_lock:
+            self.conn.executescript(";\n".join(ddl) + ";")
+        self._table_columns.update(created)
+
+    def drop_indexes(self, table_name):
+        """Drop a table's secondary indexes, returning the SQL to rebuild them.
+
+        During a bulk reload every insert pays b-tree maintenance per index;
+        dropping them first and recreating them afterwards turns that into
+        one sorted build per index. Implicit primary-key and UNIQUE indexes
+        carry no SQL in sqlite_master and are left alone.
+        """
+        cursor = self.conn.execute(
+            "SELECT name, sql FROM sqlite_master "
+            "WHERE type='index' AND tbl_name=? AND sql IS NOT NULL",
+            (table_name,),
+        )
+        indexes = cursor.fetchall()
+        saved_sql = []
+        with self.transaction():
+            for name, sql in indexes:
+                saved_sql.append(sql)
+                self.conn.execute(f'DROP INDEX "{name}"')
+        return saved_sql
+
+    def recreate_indexes(self, index_sql):
+        """Rebuild indexes from SQL previously returned by drop_indexes."""
+        with self.transaction():
+            for sql in index_sql:
+                self.conn.execute(sql)
+
+    def insert_or_update_dict(self, table_name, data_dict):
+        """Upsert one record, adding any missing columns first.
+
+        Rows from one payload share a key set, so after the first row the
+        SQL comes straight from the statement cache and the per-row work is
+        just building the parameter tuple.
+        """
+        with self.transaction():
+            self.ensure_table_and_columns(table_name, data_dict)
+            columns = tuple(sorted(data_dict))
+            sql = _compile_upsert(table_name, columns)
+            self.conn.execute(
+                sql, tuple(data_dict[c] for c in columns)
+            )
+
+    # Rows pulled from the input iterable per schema-check/upsert pass;
+    # a generator input never has more than this many rows resident.
+    _BATCH_ROWS = 512
+
+    def insert_or_update_many(self, table_name, data_list):
+        """Upsert records from any iterable with unrolled multi-row statements.
+
+        The input is consumed lazily in batches of ``_BATCH_ROWS``, so a
+        generator streams through with bounded memory while a list behaves
+        as before. Within each batch the SQL is built once from the union
+        of keys, with as many VALUES groups per statement as fit SQLite's
+        bound-parameter budget — so N rows cost N/rows_per_stmt statement
+        dispatches and one commit, not N of each.
+        """
+        records = iter(data_list)
+        with self.transaction():
+            while True:
+                batch = list(itertools.islice(records, self._BATCH_ROWS))
+                if not batch:
+                    return
+                self._upsert_batch(table_name, batch)
+
+    def _upsert_batch(self, table_name, data_list):
+        columns = tuple(
+            dict.fromkeys(k for record in data_list for k in record)
+        )
+        # Probe with a representative value per column so type inference
+        # sees real data rather than the Nones of sparse records.
+        probe = {
+            c: next((r[c] for r in data_list if r.get(c) is not None), None)
+            for c in columns
+        }
+        rows = [
+            tuple(record.get(c) for c in columns)
+            for record in data_list
+        ]
+        # Pack whole rows per statement while staying under SQLite's
+        # parameter limit; each group saved is one VDBE prologue saved.
+        rows_per_stmt = max(1, 500 // len(columns))
+        full_sql = _compile_upsert(table_name, columns, rows_per_stmt)
+        with self.transaction():
+            self.ensure_table_and_columns(table_name, probe)
+            cursor = self.conn.cursor()
+            for start in range(0, len(rows), rows_per_stmt):
+                chunk = rows[start : start + rows_per_stmt]
+                if len(chunk) == rows_per_stmt:
+                    sql = full_sql
+                else:
+                    # The final partial chunk gets a statement of its own size.
+                    sql = _compile_upsert(table_name, columns, len(chunk))
+                cursor.execute(sql, [value for row in chunk for value in row])
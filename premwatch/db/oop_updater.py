@@ -0,0 +1,672 @@
+"""Task-based updater that keeps the prem-watch database in sync with the API.
+
+Each table is owned by one ``Task`` subclass; ``DatabaseUpdater`` wires the
+tasks to a shared ``ApiClient``/``SQLiteLoader`` pair and exposes them on the
+command line. ``ComprehensiveUpdateTask`` chains the others into a full
+rebuild, level by level.
+"""
+
+import argparse
+import asyncio
+import collections
+import concurrent.futures
+import functools
+import logging
+import os
+import sys
+
+logger = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=1)
+def _load_env():
+    """Parse .env once per process and return the API key.
+
+    A service constructing one DatabaseUpdater per run would otherwise
+    re-scan the filesystem for .env on every _setup.
+    """
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    return os.getenv("API_KEY")
+
+
+def _rows(payload):
+    """Normalise an API payload to a list of records."""
+    if not payload:
+        return []
+    data = payload.get("data", [])
+    if isinstance(data, dict):
+        return [data]
+    return data
+
+
+class Task:
+    """Base class for database update tasks."""
+
+    task_name = None
+    is_general_task = False
+    # Stub tasks set this False so orchestrators skip them without a call.
+    IMPLEMENTED = True
+    # task_names this task reads output from; run_tasks groups tasks into
+    # dependency levels and only parallelises within a level.
+    depends_on = ()
+    # CLI flags as (flag, add_argument kwargs) pairs; the updater merges
+    # them into one parser, deduping flags shared between tasks.
+    ARGUMENTS = ()
+
+    def __init__(self, client, loader):
+        self.client = client
+        self.loader = loader
+
+    def execute(self, **kwargs):
+        raise NotImplementedError
+
+    def _fetch_and_load(self, endpoint, table, param_list, concurrency=8):
+        """Fetch a per-entity fan-out concurrently and bulk-load the rows.
+
+        The fetch side runs on the client's async pool (the dominant cost);
+        the rows go to the loader's writer thread as one batch. Turns an
+        O(N * round-trip) id loop into O(round-trip) within the rate budget.
+        """
+        if not param_list:
+            return
+        try:
+            payloads = asyncio.run(
+                self.client.fetch_many(endpoint, param_list, concurrency)
+            )
+        except RuntimeError:
+            # aiohttp not installed (or already inside an event loop):
+            # degrade to sequential fetches.
+            payloads = [
+                self.client._make_request("GET", endpoint, params)
+                for params in param_list
+            ]
+        rows = [row for payload in payloads for row in _rows(payload)]
+        self.loader.enqueue(table, rows)
+
+
+class UpdateLeaguesTask(Task):
+    task_name = "leagues"
+    is_general_task = True
+    ARGUMENTS = (
+        ("--country_id", {"type": int, "help": "Restrict to one country"}),
+        (
+            "--chosen_only",
+            {
+                "action": "store_true",
+                "help": "Only leagues chosen on the API account",
+            },
+        ),
+    )
+
+    def execute(self, country_id=None, chosen_only=False, **kwargs):
+        logger.info("Updating leagues")
+        leagues_data = self.client.get_leagues(
+            chosen_leagues_only=chosen_only, country_id=country_id
+        )
+        if not leagues_data:
+            logger.warning("No league data returned")
+            return
+        cleaned_leagues = [
+            {
+                "id": season.get("id"),
+                "name": league.get("name"),
+                "season": season.get("year"),
+                "country": league.get("country"),
+                "league_name": league.get("league_name"),
+                "image": league.get("image"),
+            }
+            for league in _rows(leagues_data)
+            for season in league.get("season", ())
+        ]
+        self.loader.enqueue("leagues", cleaned_leagues)
+        logger.info("Updated %d league seasons", len(cleaned_leagues))
+
+
+class UpdateCountriesTask(Task):
+    task_name = "countries"
+    is_general_task = True
+
+    def execute(self, **kwargs):
+        logger.info("Updating countries")
+        countries = _rows(self.client.get_countries())
+        self.loader.enqueue("countries", countries)
+        logger.info("Updated %d countries", len(countries))
+
+
+class UpdateMatchesTask(Task):
+    task_name = "matches"
+    is_general_task = True
+    ARGUMENTS = (
+        ("--date", {"help": "Fetch matches for this date (YYYY-MM-DD)"}),
+    )
+
+    def execute(self, date=None, **kwargs):
+        logger.info("Updating matches")
+        matches = _rows(self.client.get_matches(date=date))
+        self.loader.enqueue("matches", matches)
+        logger.info("Updated %d matches", len(matches))
+
+
+class SeasonTask(Task):
+    """A task scoped to one league season, split into fetch and load halves.
+
+    The split lets ``ComprehensiveUpdateTask`` overlap the season fetches in
+    a thread pool while every SQLite write stays on the calling thread.
+    """
+
+    table = None
+    depends_on = ("leagues",)
+
+    def fetch(self, season_id=None, **kwargs):
+        """Return the raw API payload for one season. HTTP only; no writes."""
+        raise NotImplementedError
+
+    def load(self, payload, season_id=None, **kwargs):
+        """Hand a fetched payload to the loader's writer thread."""
+        rows = _rows(payload)
+        self.loader.enqueue(self.table, rows)
+        logger.debug("Queued %d %s rows for season %s", len(rows), self.table, season_id)
+
+    def execute(self, season_id=None, **kwargs):
+        logger.debug("Updating %s for season %s", self.task_name, season_id)
+        self.load(self.fetch(season_id=season_id), season_id=season_id)
+
+
+class UpdateLeagueStatsTask(SeasonTask):
+    task_name = "league_stats"
+    table = "league_stats"
+    ARGUMENTS = (
+        ("--season_id", {"type": int, "help": "League season to update"}),
+    )
+
+    def fetch(self, season_id=None, **kwargs):
+        return self.client.get_league_stats(season_id)
+
+
+class UpdateSchedulesTask(SeasonTask):
+    task_name = "schedules"
+    table = "schedules"
+
+    def fetch(self, season_id=None, **kwargs):
+        return self.client.get_schedule(season_id)
+
+
+class UpdateTeamsTask(SeasonTask):
+    task_name = "teams"
+    table = "teams"
+
+    def fetch(self, season_id=None, **kwargs):
+        return self.client.get_league_teams(season_id, include_stats=True)
+
+    def load(self, payload, season_id=None, **kwargs):
+        # Build the flat record in one pass: plain keys pass through and the
+        # nested stats dict is inlined under stats_* keys, with no
+        # intermediate copy of the team dict.
+        cleaned_teams = [
+            {
+                **{k: v for k, v in team.items() if k != "stats"},
+                **{
+                    f"stats_{k}": v
+                    for k, v in (team.get("stats") or {}).items()
+                },
+            }
+            for team in _rows(payload)
+        ]
+        self.loader.enqueue("teams", cleaned_teams)
+        logger.debug("Queued %d teams for season %s", len(cleaned_teams), season_id)
+
+
+class UpdatePlayersTask(SeasonTask):
+    task_name = "players"
+    table = "players"
+
+    def fetch(self, season_id=None, **kwargs):
+        return self.client.get_league_players(season_id, include_stats=True)
+
+
+class UpdateRefereesTask(SeasonTask):
+    task_name = "referees"
+    table = "referees"
+
+    def fetch(self, season_id=None, **kwargs):
+        return self.client.get_league_referees(season_id)
+
+
+class UpdateLeagueTableTask(SeasonTask):
+    task_name = "league_table"
+    table = "league_table"
+
+    def fetch(self, season_id=None, **kwargs):
+        return self.client.get_league_table(season_id)
+
+
+class UpdateTeamDataTask(Task):
+    task_name = "team_data"
+    IMPLEMENTED = False
+
+    def execute(self, team_id=None, **kwargs):
+        logger.debug("Team data update for team %s is not implemented yet", team_id)
+
+
+class UpdateTeamFormTask(Task):
+    task_name = "team_form"
+    IMPLEMENTED = False
+
+    def execute(self, team_id=None, **kwargs):
+        logger.debug("Team form update for team %s is not implemented yet", team_id)
+
+
+class UpdateMatchDetailsTask(Task):
+    task_name = "match_details"
+    depends_on = ("schedules",)
+    ARGUMENTS = (("--match_id", {"type": int, "help": "Match to update"}),)
+
+    def execute(self, match_id=None, **kwargs):
+        logger.debug("Updating match details for match %s", match_id)
+        if isinstance(match_id, (list, tuple)):
+            details = self.client.get_match_details_bulk(match_id)
+        else:
+            details = _rows(self.client.get_match_details(match_id))
+        self.loader.enqueue("match_details", details)
+
+
+class UpdatePlayerStatsTask(Task):
+    task_name = "player_stats"
+    depends_on = ("players",)
+    ARGUMENTS = (("--player_id", {"type": int, "help": "Player to update"}),)
+
+    def execute(self, player_id=None, **kwargs):
+        logger.debug("Updating player stats for player %s", player_id)
+        if isinstance(player_id, (list, tuple)):
+            self._fetch_and_load(
+                "player-stats",
+                "player_stats",
+                [{"player_id": p} for p in player_id],
+            )
+            return
+        stats = _rows(self.client.get_player_stats(player_id))
+        self.loader.enqueue("player_stats", stats)
+
+
+class UpdateRefereeStatsTask(Task):
+    task_name = "referee_stats"
+    depends_on = ("referees",)
+    ARGUMENTS = (("--referee_id", {"type": int, "help": "Referee to update"}),)
+
+    def execute(self, referee_id=None, **kwargs):
+        logger.debug("Updating referee stats for referee %s", referee_id)
+        if isinstance(referee_id, (list, tuple)):
+            self._fetch_and_load(
+                "referee",
+                "referee_stats",
+                [{"referee_id": r} for r in referee_id],
+            )
+            return
+        stats = _rows(self.client.get_referee_stats(referee_id))
+        self.loader.enqueue("referee_stats", stats)
+
+
+class UpdateBttsStatsTask(Task):
+    task_name = "btts_stats"
+    is_general_task = True
+
+    def execute(self, **kwargs):
+        logger.info("Updating BTTS stats")
+        stats = _rows(self.client.get_btts_stats())
+        self.loader.enqueue("btts_stats", stats)
+
+
+class UpdateOver25StatsTask(Task):
+    task_name = "over_25_stats"
+    is_general_task = True
+
+    def execute(self, **kwargs):
+        logger.info("Updating over-2.5 stats")
+        stats = _rows(self.client.get_over_25_stats())
+        self.loader.enqueue("over_25_stats", stats)
+
+
+class ComprehensiveUpdateTask(Task):
+    task_name = "comprehensive_update"
+
+    # Season-scoped tasks that all hang off the leagues table.
+    SEASON_TASKS = (
+        "league_stats",
+        "schedules",
+        "teams",
+        "players",
+        "referees",
+        "league_table",
+    )
+
+    # Tables re-loaded wholesale below; their secondary indexes are dropped
+    # for the duration of the run and rebuilt once at the end.
+    BULK_LOADED_TABLES = (
+        "schedules",
+        "teams",
+        "players",
+        "match_details",
+        "player_stats",
+        "referee_stats",
+    )
+
+    def _iter_ids(self, table, column):
+        """Yield the distinct non-null values of a column one at a time.
+
+        A cursor walk keeps memory at one row instead of a materialised
+        100k-element list, and GROUP BY on an indexed column is satisfied
+        from the index where DISTINCT may build a temporary b-tree.
+        """
+        cursor = self.loader.reader.cursor()
+        cursor.execute(
+            f"SELECT {column} FROM {table} "
+            f"WHERE {column} IS NOT NULL GROUP BY {column}"
+        )
+        for row in cursor:
+            yield row[0]
+
+    def execute(self, country_id=None, chosen_only=False, **kwargs):
+        # Tasks are created on first use and dropped once no longer needed,
+        # so a run that never reaches a level never pays for its tasks.
+        task_instances = {}
+
+        def get_task(name):
+            return task_instances.setdefault(
+                name, REGISTERED_TASKS[name](self.client, self.loader)
+            )
+
+        def run_task(name, **params):
+            if not REGISTERED_TASKS[name].IMPLEMENTED:
+                logger.debug("Skipping %s: not implemented", name)
+                return
+            logger.debug("Running %s %s", name, params or "")
+            get_task(name).execute(**params)
+            task_instances.pop(name, None)
+
+        # Level 0: foundation tables everything else keys off.
+        run_task("countries")
+        run_task("leagues", country_id=country_id, chosen_only=chosen_only)
+        # The season loop below reads ids back out of leagues, which the
+        # writer thread may still be filling; drain the queue first.
+        self.loader.flush()
+        # The bulk-loaded tables are rewritten row by row below; drop their
+        # secondary indexes so inserts skip per-row b-tree maintenance, and
+        # rebuild each index once at the end from a single sorted pass.
+        saved_indexes = {
+            table: self.loader.drop_indexes(table)
+            for table in self.BULK_LOADED_TABLES
+        }
+        try:
+            # Level 1: per-season data. The six season tasks are independent,
+            # so their fetches overlap in a thread pool; each payload is
+            # written on this thread as it completes, keeping SQLite
+            # single-writer.
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=len(self.SEASON_TASKS)
+            ) as executor:
+                for season_id in self._iter_ids("leagues", "id"):
+                    logger.debug("Updating season %s", season_id)
+                    futures = {
+                        executor.submit(
+                            get_task(name).fetch, season_id=season_id
+                        ): name
+                        for name in self.SEASON_TASKS
+                    }
+                    for future in concurrent.futures.as_completed(futures):
+                        get_task(futures[future]).load(
+                            future.result(), season_id=season_id
+                        )
+            for name in self.SEASON_TASKS:
+                task_instances.pop(name, None)
+            # The levels below read ids out of tables the writer thread may
+            # still be filling; wait for the queue to drain first.
+            self.loader.flush()
+            # Level 2: per-team data. team_data and team_form are still
+            # stubs (IMPLEMENTED = False); restore the per-team loop here
+            # once they fetch something, rather than scanning teams only to
+            # dispatch no-ops.
+            # Level 3: per-entity detail fan-out. Matches go through the bulk
+            # id-list endpoint (one request per hundred ids); player and
+            # referee stats only accept a single id, so they stay on the
+            # concurrent path.
+            match_rows = self.client.get_match_details_bulk(
+                self._iter_ids("schedules", "id")
+            )
+            self.loader.enqueue("match_details", match_rows)
+            self._fetch_and_load(
+                "player-stats",
+                "player_stats",
+                [{"player_id": p} for p in self._iter_ids("players", "id")],
+            )
+            self._fetch_and_load(
+                "referee",
+                "referee_stats",
+                [{"referee_id": r} for r in self._iter_ids("referees", "id")],
+            )
+        finally:
+            self.loader.flush()
+            for index_sql in saved_indexes.values():
+                self.loader.recreate_indexes(index_sql)
+        # Level 4: global rankings.
+        run_task("btts_stats")
+        run_task("over_25_stats")
+
+
+TASK_CLASSES = (
+    UpdateLeaguesTask,
+    UpdateCountriesTask,
+    UpdateMatchesTask,
+    UpdateLeagueStatsTask,
+    UpdateSchedulesTask,
+    UpdateTeamsTask,
+    UpdatePlayersTask,
+    UpdateRefereesTask,
+    UpdateLeagueTableTask,
+    UpdateTeamDataTask,
+    UpdateTeamFormTask,
+    UpdateMatchDetailsTask,
+    UpdatePlayerStatsTask,
+    UpdateRefereeStatsTask,
+    UpdateBttsStatsTask,
+    UpdateOver25StatsTask,
+    ComprehensiveUpdateTask,
+)
+
+REGISTERED_TASKS = {cls.task_name: cls for cls in TASK_CLASSES}
+
+
+class DatabaseUpdater:
+    """Wires the update tasks to one client/loader pair and the CLI."""
+
+    def __init__(self, db_path="premwatch.db"):
+        self.db_path = db_path
+        self._parser = None
+        self.db_file_path = None
+        self.client = None
+        self.loader = None
+        self.synchronous = "NORMAL"
+
+    @functools.cached_property
+    def registered_tasks(self):
+        """The task registry, copied per instance on first access."""
+        return dict(REGISTERED_TASKS)
+
+    @functools.cached_property
+    def _general_task_names(self):
+        """Tuple of task names that --all expands to, derived once."""
+        return tuple(
+            name
+            for name, cls in self.registered_tasks.items()
+            if cls.is_general_task
+        )
+
+    def _setup(self):
+        # Imported here rather than at module top so narrow CLI invocations
+        # (--help, argument errors) never pay for the HTTP and DB stacks.
+        from premwatch.api.api_client import ApiClient
+        from premwatch.db.db_loader import SQLiteLoader
+
+        api_key = _load_env()
+        self.db_file_path = (
+            self.db_path
+            if self.db_path == ":memory:"
+            else os.path.abspath(self.db_path)
+        )
+        self.client = ApiClient(api_key)
+        self.loader = SQLiteLoader(
+            self.db_file_path, synchronous=self.synchronous
+        )
+
+    def run_tasks(self, task_names, **params):
+        """Run tasks as a DAG, dispatching each as its predecessors finish.
+
+        Greedy list scheduling: any task whose in-requested-set dependencies
+        have completed is submitted immediately, so a cheap task never waits
+        on a slow sibling the way level-barrier execution would make it.
+        Writes all funnel through the loader's writer thread; the queue is
+        drained before a task's dependents are released.
+        """
+        if self.loader is None:
+            self._setup()
+        requested = set(task_names)
+        in_degree = {}
+        dependents = {name: [] for name in task_names}
+        for name in task_names:
+            deps = [
+                dep
+                for dep in self.registered_tasks[name].depends_on
+                if dep in requested
+            ]
+            in_degree[name] = len(deps)
+            for dep in deps:
+                dependents[dep].append(name)
+        ready = collections.deque(
+            name for name in task_names if not in_degree[name]
+        )
+
+        def run_one(name):
+            self.registered_tasks[name](self.client, self.loader).execute(
+                **params
+            )
+
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=min(8, len(task_names))
+        ) as executor:
+            running = {}
+
+            def submit_ready():
+                while ready:
+                    name = ready.popleft()
+                    running[executor.submit(run_one, name)] = name
+
+            submit_ready()
+            if in_degree and not running:
+                raise ValueError(
+                    f"Dependency cycle among tasks: {sorted(in_degree)}"
+                )
+            while running:
+                completed, _ = concurrent.futures.wait(
+                    running, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in completed:
+                    name = running.pop(future)
+                    future.result()
+                    if dependents[name]:
+                        # Dependents read this task's table; make sure its
+                        # enqueued rows have landed first.
+                        self.loader.flush()
+                        for successor in dependents[name]:
+                            in_degree[successor] -= 1
+                            if not in_degree[successor]:
+                                ready.append(successor)
+                submit_ready()
+            unscheduled = [name for name, deg in in_degree.items() if deg]
+            if unscheduled:
+                raise ValueError(
+                    f"Dependency cycle among tasks: {sorted(unscheduled)}"
+                )
+        self.loader.flush()
+        self.loader.checkpoint()
+
+    def _create_parser(self):
+        if self._parser is not None:
+            return self._parser
+        parser = argparse.ArgumentParser(
+            description="Update the prem-watch database"
+        )
+        parser.add_argument(
+            "--task",
+            choices=sorted(self.registered_tasks),
+            help="Run a single task by name",
+        )
+        parser.add_argument(
+            "--all", action="store_true", help="Run every general task"
+        )
+        parser.add_argument(
+            "--db_path", default=self.db_path, help="Path to the SQLite database"
+        )
+        parser.add_argument(
+            "--log-level",
+            dest="log_level",
+            choices=("DEBUG", "INFO", "WARNING", "ERROR"),
+            default="WARNING",
+            help="Logging verbosity (per-entity progress is DEBUG)",
+        )
+        parser.add_argument(
+            "--pragma-synchronous",
+            dest="pragma_synchronous",
+            choices=("OFF", "NORMAL", "FULL"),
+            default="NORMAL",
+            help="SQLite synchronous level (OFF is fastest, FULL safest)",
+        )
+        seen_flags = set()
+        for task_class in self.registered_tasks.values():
+            for flag, kwargs in task_class.ARGUMENTS:
+                if flag not in seen_flags:
+                    seen_flags.add(flag)
+                    parser.add_argument(flag, **kwargs)
+        self._parser = parser
+        return parser
+
+    def run_from_cli(self, argv=None):
+        if argv is None:
+            argv = sys.argv[1:]
+        # Fast path for the common cron invocation: a bare `--task <name>`
+        # needs nothing from the 25-option parser, so skip building it.
+        if (
+            len(argv) == 2
+            and argv[0] == "--task"
+            and argv[1] in self.registered_tasks
+        ):
+            logging.basicConfig(
+                level="WARNING",
+                format="%(asctime)s %(levelname)s %(name)s %(message)s",
+            )
+            self.run_tasks([argv[1]])
+            return
+        parser = self._create_parser()
+        args = parser.parse_args(argv)
+        params = args.__dict__
+        logging.basicConfig(
+            level=params.pop("log_level"),
+            format="%(asctime)s %(levelname)s %(name)s %(message)s",
+        )
+        self.db_path = params.pop("db_path")
+        self.synchronous = params.pop("pragma_synchronous")
+        run_all = params.pop("all")
+        task = params.pop("task")
+        if run_all:
+            task_names = self._general_task_names
+        elif task:
+            task_names = [task]
+        else:
+            parser.error("specify --task or --all")
+        self.run_tasks(
+            task_names, **{k: v for k, v in params.items() if v is not None}
+        )
+
+
+if __name__ == "__main__":
+    DatabaseUpdater().run_from_cli()
@@ -0,0 +1,125 @@
+"""Procedural database update script.
+
+The straight-line predecessor of ``oop_updater``: three functions that pull
+leagues, countries and fixtures and push them into SQLite. Kept alongside
+the task framework because cron entries and docs still invoke it directly.
+"""
+
+import logging
+import os
+import re
+
+from dotenv import load_dotenv
+
+from premwatch.api.api_client import ApiClient
+from premwatch.db.db_loader import SQLiteLoader
+
+logger = logging.getLogger(__name__)
+
+_DB_NAME_RE = re.compile(r"^[\w\s-]+\.db$")
+
+
+# The league-season shape is fixed, so rows are built and inserted as
+# tuples in this column order rather than per-row dicts.
+_LEAGUE_COLUMNS = ("id", "name", "season", "country", "league_name", "image")
+
+# Representative rows for the statically known tables; bulk_init bundles
+# their first-run CREATEs into one executescript round trip, and values
+# (not just keys) matter because they drive column type inference.
+_INIT_TABLES = {
+    "countries": {"id": 0, "country": ""},
+    "leagues": {
+        "id": 0,
+        "name": "",
+        "season": 0,
+        "country": "",
+        "league_name": "",
+        "image": "",
+    },
+}
+
+
+def _league_season_rows(leagues):
+    """Flatten the league payload into one tuple per season, lazily.
+
+    The league-level fields are bound once per league rather than looked up
+    again for every season, and rows follow ``_LEAGUE_COLUMNS`` order so
+    they feed the fast inserter without intermediate dicts.
+    """
+    for league in leagues:
+        name = league.get("name")
+        country = league.get("country")
+        league_name = league.get("league_name")
+        image = league.get("image")
+        for season in league.get("season", ()):
+            yield (
+                season.get("id"),
+                name,
+                season.get("year"),
+                country,
+                league_name,
+                image,
+            )
+
+
+def update_leagues(client, loader, chosen_only=False):
+    logger.info("Updating leagues")
+    leagues_data = client.get_leagues(chosen_leagues_only=chosen_only)
+    if not leagues_data:
+        logger.warning("No league data returned")
+        return
+    insert_league = loader.make_fast_inserter("leagues", _LEAGUE_COLUMNS)
+    for row in _league_season_rows(leagues_data.get("data", [])):
+        insert_league(row)
+    logger.info("League seasons updated")
+
+
+def update_countries(client, loader):
+    logger.info("Updating countries")
+    countries_data = client.get_countries()
+    if not countries_data:
+        logger.warning("No country data returned")
+        return
+    countries = countries_data.get("data", [])
+    loader.insert_or_update_many("countries", countries)
+    logger.info("%d countries updated", len(countries))
+
+
+def update_fixtures(client, loader, date=None):
+    logger.info("Updating fixtures")
+    matches_data = client.get_matches(date=date)
+    if not matches_data:
+        logger.warning("No fixture data returned")
+        return
+    fixtures = matches_data.get("data", [])
+    loader.insert_or_update_many("fixtures", fixtures)
+    logger.info("%d fixtures updated", len(fixtures))
+
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s"
+    )
+    load_dotenv()
+    api_key = os.getenv("API_KEY")
+    while True:
+        db_name = input("Enter the database file name: ").strip()
+        if _DB_NAME_RE.match(db_name):
+            break
+        print("Invalid database name, expected something like premwatch.db")
+    client = ApiClient(api_key)
+    loader = SQLiteLoader(os.path.abspath(db_name))
+    loader.bulk_init(_INIT_TABLES)
+    try:
+        # One BEGIN IMMEDIATE around the whole run instead of a commit
+        # per insert_or_update_many call.
+        with loader.transaction():
+            update_countries(client, loader)
+            update_leagues(client, loader)
+            update_fixtures(client, loader)
+    finally:
+        loader.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Tests for premwatch.api.api_client against a mocked HTTP session."""
+
+import json
+import uuid
+from unittest.mock import Mock
+
+import pytest
+
+from premwatch.api.api_client import ApiClient, RateLimited
+
+
+@pytest.fixture
+def ok_response():
+    """Factory for a canned HTTP response mock.
+
+    Built once per test instead of hand-assembling a Mock with the same
+    three attributes in every test body. ``content`` carries the encoded
+    payload because the client decodes raw bytes rather than calling
+    ``response.json()``.
+    """
+
+    def _make(data, status=200):
+        response = Mock()
+        response.status_code = status
+        response.content = json.dumps(data).encode()
+        response.headers = {}
+        response.raise_for_status = Mock()
+        return response
+
+    return _make
+
+
+@pytest.fixture
+def client():
+    """An ApiClient with a mocked session and a private token bucket.
+
+    A fresh key per test keeps the class-level shared bucket from leaking
+    penalties between tests. No-param endpoints bypass Session.request in
+    favour of Session.send, so both entry points are mocked.
+    """
+    api_client = ApiClient(f"test-key-{uuid.uuid4()}")
+    api_client._ApiClient__session = Mock()
+    return api_client
+
+
+@pytest.mark.parametrize(
+    "method,kwargs,endpoint,params",
+    [
+        ("get_leagues", {}, "league-list", {}),
+        (
+            "get_leagues",
+            {"chosen_leagues_only": True},
+            "league-list",
+            {"chosen_leagues_only": "true"},
+        ),
+        ("get_matches", {}, "todays-matches", {}),
+        ("get_matches", {"date": "2026-08-31"}, "todays-matches", {"date": "2026-08-31"}),
+        ("get_league_stats", {"season_id": 7}, "league-statistics", {"season_id": 7}),
+        (
+            "get_schedule",
+            {"season_id": 7},
+            "league-matches",
+            {"season_id": 7, "max_per_page": 1000},
+        ),
+        ("get_league_teams", {"season_id": 7}, "league-teams", {"season_id": 7}),
+        (
+            "get_league_teams",
+            {"season_id": 7, "include_stats": True},
+            "league-teams",
+            {"season_id": 7, "include": "stats"},
+        ),
+        ("get_league_referees", {"season_id": 7}, "league-referees", {"season_id": 7}),
+        ("get_league_table", {"season_id": 7}, "league-tables", {"season_id": 7}),
+        ("get_team_data", {"team_id": 42}, "team", {"team_id": 42}),
+        ("get_match_details", {"match_id": 9}, "match", {"match_id": 9}),
+        ("get_player_stats", {"player_id": 3}, "player-stats", {"player_id": 3}),
+        ("get_referee_stats", {"referee_id": 5}, "referee", {"referee_id": 5}),
+    ],
+)
+def test_endpoint_methods(client, ok_response, method, kwargs, endpoint, params):
+    expected = {"data": [{"id": 1}]}
+    session = client._ApiClient__session
+    session.request.return_value = ok_response(expected)
+    assert getattr(client, method)(**kwargs) == expected
+    session.request.assert_called_once_with(
+        "GET", ApiClient._URLS[endpoint], params=params, headers=None
+    )
+
+
+@pytest.mark.parametrize(
+    "method,endpoint",
+    [
+        ("get_countries", "country-list"),
+        ("get_btts_stats", "stats-data-btts"),
+        ("get_over_25_stats", "stats-data-over25"),
+    ],
+)
+def test_no_param_endpoints_reuse_prepared_request(
+    client, ok_response, method, endpoint
+):
+    expected = {"data": [{"id": 1}]}
+    session = client._ApiClient__session
+    session.send.return_value = ok_response(expected)
+    assert getattr(client, method)() == expected
+    session.send.assert_called_once_with(session.prepare_request.return_value)
+    session.request.assert_not_called()
+
+
+def test_fresh_cache_entry_skips_network(client, ok_response):
+    session = client._ApiClient__session
+    session.request.return_value = ok_response({"data": [{"id": 7}]})
+    first = client.get_league_stats(7)
+    second = client.get_league_stats(7)
+    assert first == second
+    session.request.assert_called_once()
+
+
+def test_rate_limited_raises_and_penalises(client, ok_response):
+    import requests
+
+    session = client._ApiClient__session
+    response = ok_response({}, status=429)
+    response.headers = {"Retry-After": "30"}
+    response.raise_for_status.side_effect = requests.exceptions.HTTPError(
+        response=response
+    )
+    session.request.return_value = response
+    with pytest.raises(RateLimited) as excinfo:
+        client.get_league_stats(7)
+    assert excinfo.value.retry_after == 30.0
+
+
+def test_request_failure_returns_none(client):
+    import requests
+
+    session = client._ApiClient__session
+    session.request.side_effect = requests.exceptions.ConnectionError("down")
+    assert client.get_league_stats(7) is None
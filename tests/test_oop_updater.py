@@ -0,0 +1,107 @@
+"""Tests for the comprehensive update orchestration against a stub client."""
+
+import collections
+
+import pytest
+
+from premwatch.db.db_loader import SQLiteLoader
+from premwatch.db.oop_updater import ComprehensiveUpdateTask
+
+SEASON_IDS = (10, 11)
+
+
+class StubClient:
+    """Canned API responses keyed off season/entity ids.
+
+    Per-entity ids embed the season id (schedule 110 belongs to season 10,
+    and so on) so assertions can tell which loaded rows each downstream
+    fan-out actually saw.
+    """
+
+    def __init__(self):
+        self.calls = collections.defaultdict(list)
+
+    def get_countries(self):
+        return {"data": [{"id": 1, "country": "England"}]}
+
+    def get_leagues(self, chosen_leagues_only=False, country_id=None):
+        return {
+            "data": [
+                {
+                    "name": "Premier League",
+                    "country": "England",
+                    "league_name": "EPL",
+                    "image": "x.png",
+                    "season": [{"id": s, "year": 2000 + s} for s in SEASON_IDS],
+                }
+            ]
+        }
+
+    def get_league_stats(self, season_id):
+        self.calls["league_stats"].append(season_id)
+        return {"data": {"id": season_id, "seasonGoals": 5}}
+
+    def get_schedule(self, season_id):
+        return {"data": [{"id": 100 + season_id, "season_id": season_id}]}
+
+    def get_league_teams(self, season_id, include_stats=False):
+        return {
+            "data": [{"id": 200 + season_id, "name": "T", "stats": {"wins": 1}}]
+        }
+
+    def get_league_players(self, season_id, include_stats=False):
+        return {"data": [{"id": 300 + season_id}]}
+
+    def get_league_referees(self, season_id):
+        return {"data": [{"id": 400 + season_id}]}
+
+    def get_league_table(self, season_id):
+        return {"data": [{"id": 500 + season_id, "position": 1}]}
+
+    def get_match_details_bulk(self, match_ids, chunk_size=100):
+        return [{"id": m} for m in match_ids]
+
+    async def fetch_many(self, endpoint, param_list, concurrency=8):
+        key = "player_id" if endpoint == "player-stats" else "referee_id"
+        return [{"data": {"id": params[key]}} for params in param_list]
+
+    def get_btts_stats(self):
+        return {"data": [{"id": 1, "btts": 0.5}]}
+
+    def get_over_25_stats(self):
+        return {"data": [{"id": 1, "over25": 0.5}]}
+
+
+@pytest.fixture
+def loader(tmp_path):
+    loader = SQLiteLoader(str(tmp_path / "fresh.db"))
+    yield loader
+    loader.close()
+
+
+def _ids(loader, table):
+    return {row[0] for row in loader.reader.execute(f"SELECT id FROM {table}")}
+
+
+def test_comprehensive_update_on_fresh_db(loader):
+    """A full run against an empty database sees its own freshly loaded rows.
+
+    Regression test: leagues are loaded through the background writer
+    queue, so the season loop (and every later level) must flush before
+    reading ids back out — on a fresh database a missed flush crashes on
+    the missing table, and on an existing one it reads stale ids.
+    """
+    client = StubClient()
+    ComprehensiveUpdateTask(client, loader).execute()
+    loader.flush()
+    assert _ids(loader, "leagues") == set(SEASON_IDS)
+    assert sorted(client.calls["league_stats"]) == sorted(SEASON_IDS)
+    # Downstream levels fanned out over ids loaded earlier in this run.
+    assert _ids(loader, "schedules") == {100 + s for s in SEASON_IDS}
+    assert _ids(loader, "match_details") == {100 + s for s in SEASON_IDS}
+    assert _ids(loader, "player_stats") == {300 + s for s in SEASON_IDS}
+    assert _ids(loader, "referee_stats") == {400 + s for s in SEASON_IDS}
+    # The teams loader flattened the nested stats dict.
+    assert loader.reader.execute(
+        "SELECT stats_wins FROM teams WHERE id=210"
+    ).fetchone()[0] == 1